@@ -0,0 +1,48 @@
+"""Фильтр Блума.
+
+Отвечает «точно нет» или «возможно, есть». Размер битового массива и
+число хеш-функций подбираются по ожидаемому числу элементов и
+допустимой доле ложных срабатываний; позиции считаются двойным
+хешированием одного blake2b.
+"""
+import hashlib
+import math
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        capacity = max(capacity, 1)
+        self.size = max(
+            8, int(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(
+            str(value).encode(), digest_size=16
+        ).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return (
+            (first + number * second) % self.size
+            for number in range(self.hashes)
+        )
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+    def fill_ratio(self):
+        ones = sum(bin(byte).count('1') for byte in self.bits)
+        return ones / self.size
+
+    def false_positive_rate(self):
+        """Оценка доли ложных срабатываний по заполненности массива."""
+        return self.fill_ratio() ** self.hashes
@@ -0,0 +1,442 @@
+"""Кэш-бэкенды проекта.
+
+SQLiteCache — общий для всех процессов кэш в файле SQLite (WAL), замена
+Redis для одной машины. TieredCache — двухуровневый кэш: LRU в памяти
+процесса поверх общего бэкенда, с защитой от «набегов» при пересчёте
+(single-flight), вероятностным досрочным обновлением и статистикой.
+
+Пример настройки::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache.TieredCache',
+            'OPTIONS': {'L2': 'shared', 'L1_MAX_ENTRIES': 1000},
+        },
+        'shared': {
+            'BACKEND': 'core.cache.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+        },
+    }
+"""
+import math
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict, namedtuple
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_MISSING = object()
+
+# Значение, сохранённое через get_or_set: кроме самого значения хранит
+# момент истечения и время вычисления — они нужны для досрочного обновления.
+Envelope = namedtuple('Envelope', ('value', 'expires', 'delta'))
+
+
+def _unwrap(value):
+    return value.value if isinstance(value, Envelope) else value
+
+
+class SQLiteCache(BaseCache):
+    """Кэш в таблице SQLite, общий для всех процессов на машине."""
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = location
+        self._local = threading.local()
+
+    def _connection(self):
+        # Соединение своё у каждого потока и процесса: после fork
+        # унаследованное соединение использовать нельзя.
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            connection = sqlite3.connect(
+                self._path, timeout=5, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache ('
+                'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)'
+            )
+            self._local.connection = connection
+            self._local.pid = pid
+        return self._local.connection
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    @staticmethod
+    def _alive(expires):
+        return expires is None or expires > time.time()
+
+    def get(self, key, default=None, version=None):
+        row = self._connection().execute(
+            'SELECT value, expires FROM cache WHERE key = ?',
+            (self._key(key, version),)
+        ).fetchone()
+        if row is None or not self._alive(row[1]):
+            return default
+        return pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        keys = {self._key(key, version): key for key in keys}
+        found = {}
+        made = list(keys)
+        for start in range(0, len(made), 500):
+            chunk = made[start:start + 500]
+            rows = self._connection().execute(
+                'SELECT key, value, expires FROM cache WHERE key IN '
+                f'({", ".join("?" * len(chunk))})',
+                chunk,
+            )
+            for key, value, expires in rows:
+                if self._alive(expires):
+                    found[keys[key]] = pickle.loads(value)
+        return found
+
+    def _row(self, key, value, timeout, version):
+        return (
+            self._key(key, version),
+            pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+            self.get_backend_timeout(timeout),
+        )
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires) '
+            'VALUES (?, ?, ?)',
+            self._row(key, value, timeout, version),
+        )
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        rows = [
+            self._row(key, value, timeout, version)
+            for key, value in data.items()
+        ]
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN')
+            connection.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                rows,
+            )
+        self._maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key, value, expires = self._row(key, value, timeout, version)
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (key, time.time()),
+            )
+            cursor = connection.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires) '
+                'VALUES (?, ?, ?)',
+                (key, value, expires),
+            )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            row = connection.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None or not self._alive(row[1]):
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), key),
+            )
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        cursor = self._connection().execute(
+            'UPDATE cache SET expires = ? WHERE key = ?',
+            (self.get_backend_timeout(timeout), self._key(key, version)),
+        )
+        return cursor.rowcount == 1
+
+    def delete(self, key, version=None):
+        self._connection().execute(
+            'DELETE FROM cache WHERE key = ?', (self._key(key, version),)
+        )
+
+    def delete_many(self, keys, version=None):
+        connection = self._connection()
+        with connection:
+            connection.execute('BEGIN')
+            connection.executemany(
+                'DELETE FROM cache WHERE key = ?',
+                [(self._key(key, version),) for key in keys],
+            )
+
+    def has_key(self, key, version=None):
+        return self.get(key, _MISSING, version) is not _MISSING
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def _maybe_cull(self):
+        # Чистка раз в ~100 записей: просроченные строки и самые старые,
+        # если записей больше MAX_ENTRIES.
+        if random.random() > 0.01:
+            return
+        connection = self._connection()
+        connection.execute(
+            'DELETE FROM cache WHERE expires <= ?', (time.time(),)
+        )
+        count = connection.execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+        if count > self._max_entries:
+            connection.execute(
+                'DELETE FROM cache WHERE rowid IN '
+                '(SELECT rowid FROM cache ORDER BY rowid LIMIT ?)',
+                (count // self._cull_frequency,),
+            )
+
+
+class TieredCache(BaseCache):
+    """LRU в памяти процесса (L1) поверх общего бэкенда (L2).
+
+    Записи L1 живут не дольше L1_TIMEOUT секунд: это граница того,
+    насколько процесс может отставать от изменений, сделанных другими.
+    Если задан INVALIDATION_CHANNEL, удаления рассылаются через
+    core.invalidation, и другие процессы убирают ключи из своего L1.
+    get_or_set() пересчитывает значение в одном процессе, остальные ждут
+    результата (блокировка через add в L2), а незадолго до истечения
+    запускает пересчёт досрочно с вероятностью, растущей к сроку истечения
+    (XFetch), чтобы популярный ключ не истекал у всех одновременно.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._l2_alias = options.get('L2', 'shared')
+        self._l1_max_entries = options.get('L1_MAX_ENTRIES', 1000)
+        self._l1_timeout = options.get('L1_TIMEOUT', 5)
+        self._lock_timeout = options.get('LOCK_TIMEOUT', 10)
+        self._lock_poll = options.get('LOCK_POLL', 0.05)
+        self._beta = options.get('EARLY_EXPIRATION_BETA', 1.0)
+        self._l1 = OrderedDict()
+        self._l1_lock = threading.Lock()
+        self.stats = Counter()
+        self._channel = options.get('INVALIDATION_CHANNEL')
+        if self._channel:
+            from . import invalidation
+            invalidation.subscribe(self._channel, self._on_invalidate)
+
+    def _on_invalidate(self, key):
+        if key is None:
+            with self._l1_lock:
+                self._l1.clear()
+        else:
+            self._l1_delete(key)
+
+    def _publish(self, key=''):
+        if self._channel:
+            from . import invalidation
+            invalidation.publish(self._channel, key)
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    def _key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _l1_get(self, key):
+        with self._l1_lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[1] <= time.time():
+                del self._l1[key]
+                return _MISSING
+            self._l1.move_to_end(key)
+        return pickle.loads(entry[0])
+
+    def _l1_set(self, key, value, expires=None):
+        l1_expires = time.time() + self._l1_timeout
+        if expires is not None:
+            l1_expires = min(l1_expires, expires)
+        entry = (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), l1_expires)
+        with self._l1_lock:
+            self._l1[key] = entry
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._l1_lock:
+            self._l1.pop(key, None)
+
+    def _lookup(self, key):
+        """Сырое значение (возможно, Envelope) из L1 или L2."""
+        value = self._l1_get(key)
+        if value is not _MISSING:
+            self.stats['l1_hits'] += 1
+            return value
+        value = self.l2.get(key, _MISSING)
+        if value is _MISSING:
+            self.stats['misses'] += 1
+            return value
+        self.stats['l2_hits'] += 1
+        self._l1_set(
+            key, value,
+            value.expires if isinstance(value, Envelope) else None
+        )
+        return value
+
+    def get(self, key, default=None, version=None):
+        value = self._lookup(self._key(key, version))
+        return default if value is _MISSING else _unwrap(value)
+
+    def get_many(self, keys, version=None):
+        made = {self._key(key, version): key for key in keys}
+        found = {}
+        for key in made:
+            value = self._l1_get(key)
+            if value is not _MISSING:
+                found[key] = value
+        self.stats['l1_hits'] += len(found)
+        missing = [key for key in made if key not in found]
+        if missing:
+            fetched = self.l2.get_many(missing)
+            self.stats['l2_hits'] += len(fetched)
+            self.stats['misses'] += len(missing) - len(fetched)
+            for key, value in fetched.items():
+                self._l1_set(
+                    key, value,
+                    value.expires if isinstance(value, Envelope) else None
+                )
+            found.update(fetched)
+        return {made[key]: _unwrap(value) for key, value in found.items()}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self.l2.set(key, value, self._l2_timeout(timeout))
+        self._l1_set(key, value, self.get_backend_timeout(timeout))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        made = {self._key(key, version): value for key, value in data.items()}
+        failed = self.l2.set_many(made, self._l2_timeout(timeout))
+        expires = self.get_backend_timeout(timeout)
+        for key, value in made.items():
+            self._l1_set(key, value, expires)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        added = self.l2.add(key, value, self._l2_timeout(timeout))
+        if added:
+            self._l1_set(key, value, self.get_backend_timeout(timeout))
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        self._l1_delete(key)
+        return self.l2.incr(key, delta)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        self._l1_delete(key)
+        return self.l2.touch(key, self._l2_timeout(timeout))
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        self._l1_delete(key)
+        self.l2.delete(key)
+        self._publish(key)
+
+    def delete_many(self, keys, version=None):
+        made = [self._key(key, version) for key in keys]
+        for key in made:
+            self._l1_delete(key)
+        self.l2.delete_many(made)
+        for key in made:
+            self._publish(key)
+
+    def has_key(self, key, version=None):
+        return self._lookup(self._key(key, version)) is not _MISSING
+
+    def clear(self):
+        with self._l1_lock:
+            self._l1.clear()
+        self.l2.clear()
+        self._publish()
+
+    def _l2_timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT,
+                   version=None):
+        key = self._key(key, version)
+        value = self._lookup(key)
+        if value is _MISSING:
+            return self._compute_once(key, default, timeout)
+        if isinstance(value, Envelope) and self._refresh_early(value):
+            self.stats['early_refreshes'] += 1
+            return self._compute(key, default, timeout)
+        return _unwrap(value)
+
+    def _refresh_early(self, envelope):
+        if envelope.expires is None:
+            return False
+        # XFetch: -delta * beta * ln(rand) — случайный «запас» до истечения,
+        # пропорциональный времени вычисления.
+        gap = -envelope.delta * self._beta * math.log(
+            random.random() or 1e-12
+        )
+        return time.time() + gap >= envelope.expires
+
+    def _compute(self, key, default, timeout):
+        started = time.perf_counter()
+        value = default() if callable(default) else default
+        delta = time.perf_counter() - started
+        expires = self.get_backend_timeout(timeout)
+        envelope = Envelope(value, expires, delta)
+        self.l2.set(key, envelope, self._l2_timeout(timeout))
+        self._l1_set(key, envelope, expires)
+        return value
+
+    def _compute_once(self, key, default, timeout):
+        lock = f'{key}:lock'
+        if self.l2.add(lock, 1, self._lock_timeout):
+            try:
+                return self._compute(key, default, timeout)
+            finally:
+                self.l2.delete(lock)
+        self.stats['lock_waits'] += 1
+        deadline = time.monotonic() + self._lock_timeout
+        while time.monotonic() < deadline:
+            time.sleep(self._lock_poll)
+            value = self.l2.get(key, _MISSING)
+            if value is not _MISSING:
+                return _unwrap(value)
+        # Вычисляющий процесс не успел — считаем сами.
+        return self._compute(key, default, timeout)
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        hits = stats.get('l1_hits', 0) + stats.get('l2_hits', 0)
+        total = hits + stats.get('misses', 0)
+        stats['hit_ratio'] = hits / total if total else 0.0
+        stats['l1_entries'] = len(self._l1)
+        return stats
@@ -0,0 +1,26 @@
+"""Настройка соединений SQLite.
+
+PRAGMA задаются в DATABASES[alias]['PRAGMAS'] и применяются к каждому
+новому соединению по сигналу connection_created. WAL позволяет
+читателям не ждать писателя, а остальные параметры — размер кэша
+страниц, mmap и время ожидания блокировки — подбираются под нагрузку.
+"""
+import re
+
+VALID_NAME = re.compile(r'^[a-z_]+$')
+
+
+def apply_pragmas(connection, pragmas):
+    """Применяет PRAGMA к соединению sqlite3 (или курсору)."""
+    for name, value in pragmas.items():
+        if not VALID_NAME.match(name):
+            raise ValueError(f'Недопустимое имя PRAGMA: {name}')
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = connection.settings_dict.get('PRAGMAS')
+    if pragmas:
+        apply_pragmas(connection.connection, pragmas)
@@ -0,0 +1,128 @@
+"""Шина инвалидации локальных кэшей процессов.
+
+Запись в БД делает publish(channel, key); каждый процесс в начале
+запроса вызывает poll() (через InvalidationMiddleware), забирает записи
+с id больше последнего обработанного и вызывает подписчиков канала.
+Опрос — один запрос по первичному ключу, обычно с пустым результатом,
+и не чаще раза в INVALIDATION_POLL_INTERVAL секунд.
+
+Подписчик получает ключ или None — «сбросить всё»: так бывает, если
+процесс долго не опрашивал шину и мог пропустить удалённые записи.
+"""
+import threading
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+POLL_INTERVAL = getattr(settings, 'INVALIDATION_POLL_INTERVAL', 0.5)
+RETENTION = getattr(settings, 'INVALIDATION_RETENTION', 60 * 60)
+BATCH_SIZE = 1000
+
+_subscribers = defaultdict(list)
+_lock = threading.Lock()
+_state = {'last_id': None, 'last_poll': 0.0}
+
+
+def subscribe(channel, callback):
+    """callback(key) вызывается при инвалидации ключа канала."""
+    _subscribers[channel].append(callback)
+
+
+def _dispatch(channel, key):
+    for callback in _subscribers.get(channel, ()):
+        callback(key)
+
+
+def _flush_all():
+    for channel in list(_subscribers):
+        _dispatch(channel, None)
+
+
+def publish(channel, key=''):
+    """Сообщает всем процессам, что ключ канала устарел."""
+    from .models import Invalidation
+
+    entry = Invalidation.objects.create(channel=channel, key=key)
+    _dispatch(channel, key or None)
+    if entry.pk % BATCH_SIZE == 0:
+        Invalidation.objects.filter(
+            created__lt=timezone.now() - timedelta(seconds=RETENTION)
+        ).delete()
+
+
+def poll(force=False):
+    """Применяет инвалидации, опубликованные другими процессами."""
+    from .models import Invalidation
+
+    now = time.monotonic()
+    with _lock:
+        if not force and now - _state['last_poll'] < POLL_INTERVAL:
+            return
+        elapsed = now - _state['last_poll']
+        _state['last_poll'] = now
+        last_id = _state['last_id']
+        if last_id is None:
+            # Первый опрос: локальные кэши ещё пусты, начинаем с текущей
+            # позиции журнала.
+            _state['last_id'] = Invalidation.objects.order_by(
+                '-id'
+            ).values_list('id', flat=True).first() or 0
+            return
+        if elapsed > RETENTION / 2:
+            # Записи, которые процесс не успел прочитать, могли удалить.
+            _flush_all()
+        entries = list(
+            Invalidation.objects.filter(id__gt=last_id).order_by(
+                'id'
+            ).values_list('id', 'channel', 'key')[:BATCH_SIZE + 1]
+        )
+        if len(entries) > BATCH_SIZE:
+            _flush_all()
+            _state['last_id'] = entries[-1][0]
+            return
+        for entry_id, channel, key in entries:
+            _dispatch(channel, key or None)
+            _state['last_id'] = entry_id
+
+
+def reset():
+    """Начать чтение журнала заново с текущей позиции.
+
+    Нужно тестам: откат транзакции возвращает счётчик id назад.
+    """
+    with _lock:
+        _state['last_id'] = None
+        _state['last_poll'] = 0.0
+    poll(force=True)
+
+
+class LocalCache:
+    """Словарь в памяти процесса, согласованный через шину.
+
+    Подходит для редко меняющихся данных, которые дорого каждый раз
+    доставать даже из общего кэша: изменения публикуются через
+    invalidate() и доходят до остальных процессов при следующем poll().
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self._data = {}
+        subscribe(channel, self._evict)
+
+    def _evict(self, key):
+        if key is None:
+            self._data.clear()
+        else:
+            self._data.pop(key, None)
+
+    def get(self, key, default=None):
+        return self._data.get(str(key), default)
+
+    def set(self, key, value):
+        self._data[str(key)] = value
+
+    def invalidate(self, key=None):
+        publish(self.channel, '' if key is None else str(key))
@@ -0,0 +1,121 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_pragmas
+
+
+def read(connection, number):
+    connection.execute(
+        'SELECT id, text FROM post WHERE author = ? '
+        'ORDER BY id DESC LIMIT 10', (number % 100,)
+    ).fetchall()
+
+
+def write(connection, number):
+    with connection:
+        connection.execute(
+            'INSERT INTO post (author, text) VALUES (?, ?)',
+            (number % 100, 'Новый пост'),
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер параллельного чтения и записи в SQLite: настройки по '
+        'умолчанию и новое соединение на каждую операцию против PRAGMAS '
+        'из настроек и постоянных соединений. Работает на временной БД.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--seconds', type=float, default=3)
+        parser.add_argument('--rows', type=int, default=20000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        pragmas = settings.DATABASES[options['database']].get('PRAGMAS', {})
+        self.temp_dir = tempfile.mkdtemp()
+        try:
+            self.run('по умолчанию', {}, False, options)
+            self.run(
+                'PRAGMAS и постоянные соединения', pragmas, True, options
+            )
+        finally:
+            shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def connect(self, pragmas):
+        connection = sqlite3.connect(self.path)
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def populate(self, pragmas, rows):
+        connection = self.connect(pragmas)
+        with connection:
+            connection.execute(
+                'CREATE TABLE post '
+                '(id INTEGER PRIMARY KEY, author INTEGER, text TEXT)'
+            )
+            connection.execute('CREATE INDEX post_author ON post (author)')
+            connection.executemany(
+                'INSERT INTO post (author, text) VALUES (?, ?)',
+                ((number % 100, 'Тестовый пост') for number in range(rows)),
+            )
+        connection.close()
+
+    def worker(self, operation, kind, pragmas, persistent):
+        connection = self.connect(pragmas) if persistent else None
+        counts = Counter()
+        number = 0
+        while time.monotonic() < self.deadline:
+            number += 1
+            current = connection or self.connect(pragmas)
+            try:
+                operation(current, number)
+                counts[kind] += 1
+            except sqlite3.OperationalError:
+                counts['locked'] += 1
+            finally:
+                if connection is None:
+                    current.close()
+        if connection is not None:
+            connection.close()
+        with self.lock:
+            self.counts.update(counts)
+
+    def run(self, name, pragmas, persistent, options):
+        self.path = os.path.join(self.temp_dir, f'{int(persistent)}.db')
+        self.populate(pragmas, options['rows'])
+        self.counts = Counter()
+        self.lock = threading.Lock()
+        self.deadline = time.monotonic() + options['seconds']
+        threads = [
+            threading.Thread(
+                target=self.worker, args=(read, 'read', pragmas, persistent)
+            )
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(
+                target=self.worker,
+                args=(write, 'write', pragmas, persistent),
+            )
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = options['seconds']
+        self.stdout.write(
+            f'{name:<35} чтений {self.counts["read"] / seconds:9.0f}/с, '
+            f'записей {self.counts["write"] / seconds:7.0f}/с, '
+            f'ошибок блокировки {self.counts["locked"]}'
+        )
@@ -0,0 +1,41 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную БД SQLite в реплики из DATABASE_REPLICAS '
+        'через backup API.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float,
+            help='Повторять каждые N секунд, пока команду не остановят.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                self.sync(alias)
+            elapsed = time.perf_counter() - started
+            if options['verbosity'] > 1:
+                self.stdout.write(f'Реплики обновлены за {elapsed:.3f} с')
+            if options['interval'] is None:
+                return
+            time.sleep(max(options['interval'] - elapsed, 0))
+
+    def sync(self, alias):
+        source = connections[DEFAULT_DB_ALIAS]
+        source.ensure_connection()
+        # Своё соединение: у Django-соединения реплики query_only.
+        target = sqlite3.connect(connections[alias].settings_dict['NAME'])
+        try:
+            source.connection.backup(target)
+        finally:
+            target.close()
@@ -0,0 +1,36 @@
+from django.conf import settings
+
+from . import invalidation, routers
+
+
+class InvalidationMiddleware:
+    """В начале запроса применяет инвалидации из других процессов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        invalidation.poll()
+        return self.get_response(request)
+
+
+class PrimaryPinMiddleware:
+    """Закрепляет чтение за основной БД после записи (core.routers)."""
+
+    cookie_name = 'db_primary'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.start(pinned=self.cookie_name in request.COOKIES)
+        try:
+            response = self.get_response(request)
+            if routers.wrote():
+                response.set_cookie(
+                    self.cookie_name, '1',
+                    max_age=settings.REPLICA_PIN_SECONDS, httponly=True,
+                )
+        finally:
+            routers.finish()
+        return response
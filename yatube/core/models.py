@@ -0,0 +1,15 @@
+from django.db import models
+
+
+class Invalidation(models.Model):
+    """Журнал инвалидаций для локальных кэшей процессов.
+
+    id растёт монотонно и служит номером версии: процесс помнит последний
+    обработанный id и при опросе забирает только новые записи.
+    """
+    channel = models.CharField(max_length=50)
+    key = models.CharField(max_length=250, blank=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f'{self.channel}:{self.key}'
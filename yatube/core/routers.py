@@ -0,0 +1,62 @@
+"""Маршрутизация запросов между основной БД и репликами.
+
+Запись всегда идёт в default, чтение — в случайную реплику из
+DATABASE_REPLICAS. Чтобы пользователь сразу видел свой пост,
+комментарий или подписку, чтение закрепляется за основной БД:
+до конца запроса после первой записи и ещё REPLICA_PIN_SECONDS
+секунд по cookie, которую ставит PrimaryPinMiddleware. Внутри
+transaction.atomic чтение тоже идёт в основную БД.
+"""
+import random
+import threading
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = threading.local()
+
+
+def start(pinned=False):
+    """Начало запроса; pinned — читать только из основной БД."""
+    _state.pinned = pinned
+    _state.wrote = False
+
+
+def wrote():
+    return getattr(_state, 'wrote', False)
+
+
+def finish():
+    _state.pinned = False
+    _state.wrote = False
+
+
+def _replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = _replicas()
+        if (
+            not replicas
+            or getattr(_state, 'pinned', False)
+            or wrote()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Реплики получают схему вместе с данными (sync_replica).
+        return db not in _replicas()
@@ -0,0 +1,18 @@
+from django.test import SimpleTestCase
+
+from core.bloom import BloomFilter
+
+
+class BloomFilterTests(SimpleTestCase):
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(1000, error_rate=0.01)
+        for number in range(1000):
+            bloom.add(f'user{number}')
+        self.assertTrue(
+            all(f'user{number}' in bloom for number in range(1000))
+        )
+        false_positives = sum(
+            f'other{number}' in bloom for number in range(10000)
+        )
+        self.assertLess(false_positives / 10000, 0.02)
+        self.assertLess(bloom.false_positive_rate(), 0.02)
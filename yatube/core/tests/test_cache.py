@@ -0,0 +1,86 @@
+import shutil
+import tempfile
+import threading
+import time
+
+from django.core.cache import caches
+from django.test import SimpleTestCase
+
+from core.cache import Envelope, SQLiteCache, TieredCache
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache = SQLiteCache(f'{self.temp_dir}/cache.sqlite3', {})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_basic_operations(self):
+        self.cache.set('key', {'a': 1})
+        self.assertEqual(self.cache.get('key'), {'a': 1})
+        self.assertFalse(self.cache.add('key', 'other'))
+        self.assertTrue(self.cache.add('new', 'value'))
+        self.assertEqual(
+            self.cache.get_many(['key', 'new', 'missing']),
+            {'key': {'a': 1}, 'new': 'value'}
+        )
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_incr_and_expiry(self):
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 2), 3)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+        self.cache.set('expired', 1, timeout=0)
+        self.assertIsNone(self.cache.get('expired'))
+        self.assertTrue(self.cache.add('expired', 2))
+
+
+class TieredCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['shared'].clear()
+        self.cache = TieredCache('', {
+            'OPTIONS': {
+                'L2': 'shared', 'L1_MAX_ENTRIES': 2, 'LOCK_TIMEOUT': 2,
+            },
+        })
+
+    def test_l1_is_bounded_lru(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+        self.assertEqual(self.cache.get('c'), 'c')
+        self.assertEqual(self.cache.get('a'), 'a')
+        stats = self.cache.get_stats()
+        self.assertEqual(stats['l1_hits'], 1)
+        self.assertEqual(stats['l2_hits'], 1)
+        self.assertEqual(stats['l1_entries'], 2)
+
+    def test_get_or_set_waits_for_other_worker(self):
+        """Пока ключ пересчитывает другой процесс, значение ждут, а не
+        вычисляют повторно."""
+        key = self.cache.make_key('feed')
+        caches['shared'].add(f'{key}:lock', 1)
+
+        def other_worker():
+            time.sleep(0.1)
+            caches['shared'].set(key, Envelope('готово', None, 0))
+
+        threading.Thread(target=other_worker).start()
+
+        def compute():
+            raise AssertionError('Значение не должно вычисляться дважды')
+
+        self.assertEqual(self.cache.get_or_set('feed', compute), 'готово')
+        self.assertEqual(self.cache.get_stats()['lock_waits'], 1)
+
+    def test_early_refresh_before_expiry(self):
+        """Дорогое значение у границы истечения пересчитывается досрочно."""
+        key = self.cache.make_key('slow')
+        caches['shared'].set(
+            key, Envelope('старое', time.time() + 0.5, 100)
+        )
+        self.assertEqual(self.cache.get_or_set('slow', 'новое'), 'новое')
+        self.assertEqual(self.cache.get_stats()['early_refreshes'], 1)
@@ -0,0 +1,25 @@
+import sqlite3
+
+from django.conf import settings
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core.db import apply_pragmas
+
+
+class PragmaTests(TestCase):
+    def test_pragmas_applied_to_connection(self):
+        pragmas = settings.DATABASES['default']['PRAGMAS']
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], pragmas['busy_timeout'])
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], pragmas['cache_size'])
+
+
+class ApplyPragmasTests(SimpleTestCase):
+    def test_rejects_unsafe_names(self):
+        with self.assertRaises(ValueError):
+            apply_pragmas(
+                sqlite3.connect(':memory:'), {'cache_size = 1; DROP': 1}
+            )
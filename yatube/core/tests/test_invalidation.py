@@ -0,0 +1,32 @@
+from django.core.cache import cache, caches
+from django.test import TestCase
+
+from core import invalidation
+from core.models import Invalidation
+
+
+class InvalidationBusTests(TestCase):
+    def setUp(self):
+        invalidation.reset()
+
+    def test_local_cache_evicted_by_other_process(self):
+        """Запись другого процесса в журнал сбрасывает локальный ключ."""
+        groups = invalidation.LocalCache('groups')
+        groups.set('slug', 'Группа')
+        groups.set('other', 'Другая')
+        Invalidation.objects.create(channel='groups', key='slug')
+        invalidation.poll(force=True)
+        self.assertIsNone(groups.get('slug'))
+        self.assertEqual(groups.get('other'), 'Другая')
+
+    def test_tiered_cache_l1_evicted(self):
+        """Удаление ключа в другом процессе убирает его и из L1."""
+        cache.set('key', 'старое')
+        # Другой процесс удалил ключ из общего кэша и опубликовал это.
+        caches['shared'].delete(cache.make_key('key'))
+        self.assertEqual(cache.get('key'), 'старое')
+        Invalidation.objects.create(
+            channel='cache', key=cache.make_key('key')
+        )
+        invalidation.poll(force=True)
+        self.assertIsNone(cache.get('key'))
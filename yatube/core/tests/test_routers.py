@@ -0,0 +1,68 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from django.core.management import call_command
+from django.db import connections, transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import routers
+from posts.models import Group, Post, User
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class PrimaryReplicaRouterTests(TestCase):
+    def setUp(self):
+        self.router = routers.PrimaryReplicaRouter()
+        routers.start()
+
+    def tearDown(self):
+        routers.finish()
+
+    def test_reads_go_to_replica_until_write(self):
+        self.assertEqual(self.router.db_for_read(Post), 'replica')
+        self.assertEqual(self.router.db_for_write(Post), 'default')
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_pinned_and_atomic_reads_go_to_primary(self):
+        with transaction.atomic():
+            self.assertEqual(self.router.db_for_read(Post), 'default')
+        routers.start(pinned=True)
+        self.assertEqual(self.router.db_for_read(Post), 'default')
+
+    def test_write_sets_pin_cookie(self):
+        user = User.objects.create_user(username='Luchik')
+        self.client.force_login(user)
+        response = self.client.post(
+            reverse('posts:post_create'), {'text': 'Новый пост'}
+        )
+        self.assertIn('db_primary', response.cookies)
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn('db_primary', response.cookies)
+
+
+class SyncReplicaTests(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'replica.sqlite3')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_backup_copies_rows(self):
+        Group.objects.create(title='Группа', slug='group')
+        replica = {**connections['default'].settings_dict, 'NAME': self.path}
+        with override_settings(DATABASE_REPLICAS=['replica']):
+            connections.databases['replica'] = replica
+            try:
+                call_command('sync_replica')
+            finally:
+                del connections.databases['replica']
+        connection = sqlite3.connect(self.path)
+        count, = connection.execute(
+            'SELECT COUNT(*) FROM posts_group WHERE slug = ?', ('group',)
+        ).fetchone()
+        connection.close()
+        self.assertEqual(count, 1)
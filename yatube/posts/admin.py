@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Follow, Post, Group, Comment
+from .models import Follow, Post, Group, Comment, GroupFollow, Mute
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -15,3 +15,5 @@ admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
 admin.site.register(Comment)
 admin.site.register(Follow)
+admin.site.register(GroupFollow)
+admin.site.register(Mute)
@@ -0,0 +1,38 @@
+"""Кэш отрисованных карточек постов.
+
+Карточка (posts/includes/post_card.html) одна для всех лент и не
+зависит от читателя, поэтому её HTML кэшируется по id поста и времени
+его изменения: правка поста меняет ключ, а старая запись просто
+истекает. Страница ленты — один get_many на все карточки и отрисовка
+только промахов. Автор и группа в ключ не входят: их переименование
+доходит до карточек не позже CARD_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+TEMPLATE = 'posts/includes/post_card.html'
+TIMEOUT = getattr(settings, 'CARD_CACHE_TIMEOUT', 60 * 10)
+
+
+def card_key(post):
+    return f'card:{post.pk}:{post.updated.timestamp()}'
+
+
+def render_card(post):
+    return get_template(TEMPLATE).render({'post': post})
+
+
+def render_cards(posts):
+    """HTML карточек постов в том же порядке."""
+    keys = {card_key(post): post for post in posts}
+    cards = cache.get_many(keys)
+    missing = {
+        key: render_card(post) for key, post in keys.items()
+        if key not in cards
+    }
+    if missing:
+        cache.set_many(missing, TIMEOUT)
+        cards.update(missing)
+    return [mark_safe(cards[key]) for key in keys]
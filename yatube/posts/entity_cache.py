@@ -0,0 +1,107 @@
+"""Кэш сущностей Post, User и Group со сквозным чтением.
+
+Объекты хранятся по первичному ключу, а естественные ключи (username,
+slug) ссылаются на pk. hydrate() собирает посты по списку id за одно
+обращение к кэшу и один запрос к БД для промахов. Записи сбрасываются
+обработчиками post_save/post_delete в posts.signals. Ключи, которых
+точно нет по posts.negative_cache, в БД не ищутся.
+
+Посты кэшируются вместе с автором и группой, поэтому переименование
+автора или группы доходит до постов не позже ENTITY_CACHE_TIMEOUT.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from . import negative_cache
+from .models import Group, Post, User
+
+TIMEOUT = getattr(settings, 'ENTITY_CACHE_TIMEOUT', 60 * 10)
+
+
+def post_key(pk):
+    return f'entity:post:{pk}'
+
+
+def user_key(pk):
+    return f'entity:user:{pk}'
+
+
+def username_key(username):
+    return f'entity:username:{username}'
+
+
+def group_key(pk):
+    return f'entity:group:{pk}'
+
+
+def slug_key(slug):
+    return f'entity:slug:{slug}'
+
+
+def _posts():
+    return Post.objects.select_related('author', 'group')
+
+
+def hydrate(ids):
+    """Посты по списку id в том же порядке; отсутствующие пропускаются."""
+    ids = [int(pk) for pk in ids]
+    keys = {post_key(pk): pk for pk in ids}
+    found = {
+        keys[key]: post for key, post in cache.get_many(keys).items()
+    }
+    missing = negative_cache.might_exist_many(
+        'post', [pk for pk in ids if pk not in found]
+    )
+    if missing:
+        fetched = _posts().in_bulk(missing)
+        cache.set_many(
+            {post_key(pk): post for pk, post in fetched.items()}, TIMEOUT
+        )
+        found.update(fetched)
+    return [found[pk] for pk in ids if pk in found]
+
+
+def get_post(pk):
+    posts = hydrate([pk])
+    if not posts:
+        raise Http404('Пост не найден')
+    return posts[0]
+
+
+def _by_natural_key(model, natural_key, pk_key, field, value):
+    pk = cache.get(natural_key(value))
+    if pk is not None:
+        obj = cache.get(pk_key(pk))
+        # Ключ мог смениться после записи ссылки — тогда это промах.
+        if obj is not None and getattr(obj, field) == value:
+            return obj
+    obj = None
+    if negative_cache.might_exist(field, value):
+        obj = model.objects.filter(**{field: value}).first()
+    if obj is None:
+        raise Http404(f'{model._meta.verbose_name} не найден')
+    cache.set_many(
+        {natural_key(value): obj.pk, pk_key(obj.pk): obj}, TIMEOUT
+    )
+    return obj
+
+
+def get_user(username):
+    return _by_natural_key(User, username_key, user_key, 'username', username)
+
+
+def get_group(slug):
+    return _by_natural_key(Group, slug_key, group_key, 'slug', slug)
+
+
+def invalidate_post(pk):
+    cache.delete(post_key(pk))
+
+
+def invalidate_user(user):
+    cache.delete_many([user_key(user.pk), username_key(user.username)])
+
+
+def invalidate_group(group):
+    cache.delete_many([group_key(group.pk), slug_key(group.slug)])
@@ -0,0 +1,223 @@
+"""Кэшированные списки id постов для лент.
+
+Для каждой ленты (главная, группа, автор, подписки пользователя) в
+кэше лежит пара (total, ids): число постов в ленте и массив id самых
+свежих FEED_IDS_LIMIT из них. Страница — срез массива и
+entity_cache.hydrate(), а счётчик для пагинатора берётся из total без
+COUNT(*). Страницы дальше окна читаются из БД.
+
+Списки правятся на месте при создании и удалении постов (обработчики
+в posts.signals), причём только те, что уже есть в кэше. Правка идёт
+под коротким замком (cache.add); если взять его не удалось, список
+удаляется и соберётся заново. Поэтому списки читаются из FEED_IDS_CACHE
+мимо L1 TieredCache: правка по устаревшей копии затёрла бы чужую.
+"""
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import entity_cache
+from .models import Follow, GroupFollow, Mute, Post
+
+LIMIT = getattr(settings, 'FEED_IDS_LIMIT', 1000)
+TIMEOUT = getattr(settings, 'FEED_IDS_TIMEOUT', 60 * 60)
+CACHE_ALIAS = getattr(settings, 'FEED_IDS_CACHE', 'default')
+LOCK_TIMEOUT = 5
+TYPECODE = 'I'
+GENERATION_KEY = 'feed_ids:generation'
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _keys(cache, names):
+    generation = cache.get(GENERATION_KEY, 0)
+    return {f'feed_ids:{generation}:{name}': name for name in names}
+
+
+def _unpack(entry):
+    ids = array(TYPECODE)
+    ids.frombytes(entry[1])
+    return entry[0], ids
+
+
+def _pack(total, ids):
+    return total, ids.tobytes()
+
+
+def _select_ids(queryset, start, stop):
+    # pub_date нужен в выборке: UNION сортируется только по выбранным
+    # столбцам.
+    rows = queryset.values_list('pk', 'pub_date')[start:stop]
+    return array(TYPECODE, (pk for pk, _ in rows))
+
+
+def _build(queryset):
+    ids = _select_ids(queryset, 0, LIMIT + 1)
+    if len(ids) <= LIMIT:
+        return len(ids), ids
+    return queryset.count(), ids[:LIMIT]
+
+
+class FeedIds:
+    """Лента как последовательность для Paginator.
+
+    Срез возвращает список постов, собранный hydrate(). Если часть id
+    не нашлась (пропущенный сигнал, откат транзакции), список
+    пересобирается один раз.
+    """
+
+    def __init__(self, name, queryset):
+        self.name = name
+        self.queryset = queryset
+        self._entry = None
+
+    def _load(self):
+        if self._entry is None:
+            cache = _cache()
+            key, = _keys(cache, [self.name])
+            entry = cache.get(key)
+            if entry is None:
+                entry = _pack(*_build(self.queryset))
+                cache.set(key, entry, TIMEOUT)
+            self._entry = _unpack(entry)
+        return self._entry
+
+    def invalidate(self):
+        cache = _cache()
+        cache.delete_many(list(_keys(cache, [self.name])))
+        self._entry = None
+
+    def count(self):
+        return self._load()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def _ids(self, start, stop):
+        total, ids = self._load()
+        if stop <= len(ids) or len(ids) == total:
+            return ids[start:stop]
+        return _select_ids(self.queryset, start, stop)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop, _ = index.indices(self.count())
+        page_ids = list(self._ids(start, stop))
+        posts = entity_cache.hydrate(page_ids)
+        if len(posts) < len(page_ids):
+            self.invalidate()
+            posts = entity_cache.hydrate(list(self._ids(start, stop)))
+        return posts
+
+
+def index():
+    return FeedIds('index', Post.objects.all())
+
+
+def group(group):
+    return FeedIds(f'group:{group.pk}', group.posts.all())
+
+
+def author(author):
+    return FeedIds(f'author:{author.pk}', author.posts.all())
+
+
+def follow(user, queryset):
+    """Лента подписок; queryset — views.personal_feed(user)."""
+    return FeedIds(f'follow:{user.pk}', queryset)
+
+
+def _edit(names, change):
+    """Применяет change(total, ids) к спискам names, которые есть в кэше."""
+    cache = _cache()
+    keys = _keys(cache, names)
+    for key in cache.get_many(list(keys)):
+        lock = f'{key}:lock'
+        if not cache.add(lock, 1, LOCK_TIMEOUT):
+            cache.delete(key)
+            continue
+        try:
+            entry = cache.get(key)
+            if entry is not None:
+                cache.set(key, _pack(*change(*_unpack(entry))), TIMEOUT)
+        finally:
+            cache.delete(lock)
+
+
+def _follower_names(author_id, group_ids):
+    """Ленты подписок, в которые попадают посты автора и групп."""
+    users = set(
+        Follow.objects.filter(author_id=author_id).values_list(
+            'user_id', flat=True
+        )
+    )
+    if group_ids:
+        users.update(
+            GroupFollow.objects.filter(group_id__in=group_ids).values_list(
+                'user_id', flat=True
+            )
+        )
+    users.difference_update(
+        Mute.objects.filter(author_id=author_id).values_list(
+            'user_id', flat=True
+        )
+    )
+    return [f'follow:{user_id}' for user_id in users]
+
+
+def _names(post):
+    names = ['index', f'author:{post.author_id}']
+    group_ids = [post.group_id] if post.group_id else []
+    names.extend(f'group:{group_id}' for group_id in group_ids)
+    return names + _follower_names(post.author_id, group_ids)
+
+
+def post_created(post):
+    def prepend(total, ids):
+        if post.pk in ids:
+            return total, ids
+        ids.insert(0, post.pk)
+        if len(ids) > LIMIT:
+            ids.pop()
+        return total + 1, ids
+
+    _edit(_names(post), prepend)
+
+
+def post_deleted(post):
+    def remove(total, ids):
+        if post.pk in ids:
+            ids.remove(post.pk)
+            return total - 1, ids
+        # Пост старше окна: меняется только счётчик.
+        return max(total - 1, len(ids)), ids
+
+    _edit(_names(post), remove)
+
+
+def post_moved(post, old_group_id):
+    """Пост сменил группу: списки групп и их подписчиков собираются заново."""
+    group_ids = [pk for pk in (old_group_id, post.group_id) if pk]
+    names = [f'group:{group_id}' for group_id in group_ids]
+    names += _follower_names(post.author_id, group_ids)
+    cache = _cache()
+    cache.delete_many(list(_keys(cache, names)))
+
+
+def invalidate_follow(user_id):
+    """Подписки или скрытые авторы пользователя изменились."""
+    cache = _cache()
+    cache.delete_many(list(_keys(cache, [f'follow:{user_id}'])))
+
+
+def reset():
+    """Сбрасывает все списки разом, например после массового импорта."""
+    cache = _cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 1, None)
@@ -0,0 +1,156 @@
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import linebreaksbr, truncatechars
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from .models import Group, Post, User
+
+# Страховочное время жизни: правки постов не меняют ETag ленты,
+# поэтому закэшированный документ рано или поздно должен обновиться.
+FEED_CACHE_TIMEOUT = 60 * 15
+
+
+class LatestPostsFeed(Feed):
+    """Последние записи сайта."""
+
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+    items_count = 20
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def get_queryset(self, obj):
+        return Post.objects.all()
+
+    def scope(self, obj):
+        return 'index'
+
+    def items(self, obj):
+        return self.get_queryset(obj).select_related(
+            'author', 'group'
+        )[:self.items_count]
+
+    def item_title(self, item):
+        return truncatechars(item.text, 50)
+
+    def item_description(self, item):
+        return linebreaksbr(item.text)
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_categories(self, item):
+        return [item.group.title] if item.group else []
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    """Записи группы."""
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def get_queryset(self, obj):
+        return obj.posts.all()
+
+    def scope(self, obj):
+        return f'group:{obj.pk}'
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    """Записи автора."""
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.username}'
+
+    def description(self, obj):
+        return f'Все записи пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def get_queryset(self, obj):
+        return obj.posts.all()
+
+    def scope(self, obj):
+        return f'author:{obj.pk}'
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def cached_feed(feed_class):
+    """Оборачивает ленту в кэш и условные запросы.
+
+    Версия ленты — id и дата последнего поста в её области, так что
+    документ живёт в кэше до следующей публикации, а читатели лент
+    с If-None-Match/If-Modified-Since получают 304 без рендеринга.
+    """
+    feed = feed_class()
+
+    def view(request, **kwargs):
+        obj = feed.get_object(request, **kwargs)
+        latest = feed.get_queryset(obj).order_by('-pk').values_list(
+            'pk', 'pub_date'
+        ).first()
+        latest_pk, last_modified = latest or (0, None)
+        version = f'{feed_class.__name__}:{feed.scope(obj)}:{latest_pk}'
+        etag = quote_etag(version)
+        timestamp = last_modified.timestamp() if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            cache_key = f'feed:{version}'
+            cached = cache.get(cache_key)
+            if cached is None:
+                rendered = feed(request, **kwargs)
+                cached = (rendered.content, rendered['Content-Type'])
+                cache.set(cache_key, cached, FEED_CACHE_TIMEOUT)
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    return view
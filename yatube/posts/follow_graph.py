@@ -0,0 +1,57 @@
+"""Кэш графа подписок.
+
+Для каждого пользователя в кэше хранится отсортированный массив id
+авторов, на которых он подписан (4 байта на подписку). Проверка
+подписки — бинарный поиск, проверка для страницы авторов — один
+запрос в кэш вместо запроса к БД на каждую строку.
+"""
+from array import array
+from bisect import bisect_left
+
+from django.core.cache import cache
+
+from .models import Follow
+
+CACHE_TIMEOUT = 60 * 60
+TYPECODE = 'I'
+
+
+def _cache_key(user_id):
+    return f'follow_graph:{user_id}'
+
+
+def following_ids(user_id):
+    """Отсортированный массив id авторов, на которых подписан user_id."""
+    ids = array(TYPECODE)
+    data = cache.get(_cache_key(user_id))
+    if data is not None:
+        ids.frombytes(data)
+        return ids
+    ids.extend(
+        Follow.objects.filter(user_id=user_id).order_by(
+            'author_id'
+        ).values_list('author_id', flat=True)
+    )
+    cache.set(_cache_key(user_id), ids.tobytes(), CACHE_TIMEOUT)
+    return ids
+
+
+def _contains(ids, author_id):
+    index = bisect_left(ids, author_id)
+    return index < len(ids) and ids[index] == author_id
+
+
+def is_following(user_id, author_id):
+    return _contains(following_ids(user_id), author_id)
+
+
+def following_among(user_id, author_ids):
+    """Множество тех author_ids, на которых подписан user_id."""
+    ids = following_ids(user_id)
+    return {
+        author_id for author_id in author_ids if _contains(ids, author_id)
+    }
+
+
+def invalidate(user_id):
+    cache.delete(_cache_key(user_id))
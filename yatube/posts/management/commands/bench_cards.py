@@ -0,0 +1,64 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.cards import card_key, render_card, render_cards
+from posts.models import Group, Post, User
+
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер отрисовки карточек страницы ленты: каждый раз заново и из '
+        'кэша карточек. Посты создаются в транзакции, которая '
+        'откатывается после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            posts = self.populate()
+            self.report(
+                'без кэша',
+                lambda: [render_card(post) for post in posts],
+                options['repeat'],
+            )
+            render_cards(posts)
+            self.report(
+                'кэш карточек', lambda: render_cards(posts),
+                options['repeat'],
+            )
+            transaction.set_rollback(True)
+        cache.delete_many([card_key(post) for post in posts])
+
+    def populate(self):
+        prefix = f'bench{time.time_ns()}'
+        author = User.objects.create(
+            username=prefix, first_name='Автор', last_name='Замера'
+        )
+        group = Group.objects.create(title=prefix, slug=prefix)
+        Post.objects.bulk_create(
+            Post(text='Тестовый пост\n' * 20, author=author, group=group)
+            for _ in range(PAGE_SIZE)
+        )
+        return list(
+            Post.objects.filter(author=author).select_related(
+                'author', 'group'
+            )
+        )
+
+    def report(self, name, render, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render()
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'{name:<40} {statistics.median(timings) * 1000:8.2f} мс'
+        )
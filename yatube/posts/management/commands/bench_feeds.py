@@ -0,0 +1,129 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from posts import feed_ids, muting
+from posts.models import Follow, Group, GroupFollow, Mute, Post, User
+from posts.views import personal_feed
+
+PAGE_SIZE = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Замер запросов лент на синтетических данных. Данные создаются '
+        'в транзакции, которая откатывается после замеров.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--posts', type=int, default=50000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument(
+            '--followed', type=int, default=200,
+            help='На скольких авторов подписан читатель.'
+        )
+        parser.add_argument(
+            '--subscribed', type=int, default=20,
+            help='На сколько групп подписан читатель.'
+        )
+        parser.add_argument(
+            '--muted', type=int, nargs='+', default=[0, 10, 10000],
+            help='Сколько авторов скрыл читатель (несколько замеров).'
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        with transaction.atomic():
+            reader = self.populate(options)
+            for name, queryset in self.scenarios(reader, options):
+                self.report(name, queryset, options['repeat'])
+            transaction.set_rollback(True)
+        # Данные откатились, а кэш нет: id читателя ещё выдадут другому.
+        feed_ids.invalidate_follow(reader.pk)
+        muting.invalidate(reader.pk)
+
+    def populate(self, options):
+        prefix = f'bench{time.time_ns()}'
+        User.objects.bulk_create(
+            User(username=f'{prefix}_{number}')
+            for number in range(
+                max(options['users'], *options['muted']) + 1
+            )
+        )
+        users = list(User.objects.filter(
+            username__startswith=prefix
+        ).order_by('pk'))
+        reader, authors = users[0], users[1:]
+        Group.objects.bulk_create(
+            Group(title=f'{prefix}_{number}', slug=f'{prefix}_{number}')
+            for number in range(options['groups'])
+        )
+        groups = list(Group.objects.filter(slug__startswith=prefix))
+        # Активность авторов распределена по степенному закону.
+        weights = [1 / (rank + 1) for rank in range(len(authors))]
+        post_authors = self.random.choices(
+            authors, weights, k=options['posts']
+        )
+        Post.objects.bulk_create(
+            Post(
+                text='Тестовый пост',
+                author=author,
+                group=self.random.choice(groups + [None]),
+            )
+            for author in post_authors
+        )
+        Follow.objects.bulk_create(
+            Follow(user=reader, author=author)
+            for author in self.random.sample(authors, options['followed'])
+        )
+        GroupFollow.objects.bulk_create(
+            GroupFollow(user=reader, group=group)
+            for group in self.random.sample(groups, options['subscribed'])
+        )
+        return reader
+
+    def scenarios(self, reader, options):
+        yield 'follow: OR по JOIN', Post.objects.filter(
+            Q(author__following__user=reader)
+            | Q(group__subscribers__user=reader)
+        ).distinct()
+        yield 'follow: UNION', personal_feed(reader)
+        # Лента собирается заново на каждом повторе, как в запросе: так
+        # в замер попадает чтение списка id из кэша, а не из памяти.
+        yield 'follow: список id в кэше', lambda: feed_ids.follow(
+            reader, personal_feed(reader)
+        )
+        authors = list(
+            User.objects.filter(posts__isnull=False).distinct()
+        ) + list(User.objects.filter(posts__isnull=True).exclude(pk=reader.pk))
+        for count in options['muted']:
+            Mute.objects.filter(user=reader).delete()
+            Mute.objects.bulk_create(
+                Mute(user=reader, author=author) for author in authors[:count]
+            )
+            muting.invalidate(reader.pk)
+            yield f'index: скрыто {count}, JOIN', Post.objects.exclude(
+                author__muted_by__user=reader
+            )
+            yield f'index: скрыто {count}', muting.exclude_muted(
+                Post.objects.all(), reader
+            )
+
+    def report(self, name, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            feed = queryset() if callable(queryset) else queryset
+            feed.count()
+            list(feed[:PAGE_SIZE])
+            timings.append(time.perf_counter() - started)
+        self.stdout.write(
+            f'{name:<40} {statistics.median(timings) * 1000:8.1f} мс'
+        )
@@ -0,0 +1,69 @@
+import time
+from itertools import chain
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Follow, FollowSuggestion
+from posts.suggestions import random_graph, suggest
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рекомендаций «на кого подписаться».'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', type=int, action='append', dest='users',
+            help='Пересчитать только для указанных id (можно повторять).'
+        )
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--benchmark-edges', type=int,
+            help='Замерить расчёт на синтетическом графе из N рёбер, '
+                 'не трогая БД.'
+        )
+
+    def handle(self, *args, **options):
+        if options['benchmark_edges']:
+            return self.benchmark(options['benchmark_edges'], options['top'])
+        edges = Follow.objects.values_list('user_id', 'author_id')
+        pairs = np.fromiter(
+            chain.from_iterable(edges.iterator()), np.int64
+        ).reshape(-1, 2)
+        followers, authors = pairs[:, 0], pairs[:, 1]
+        started = time.perf_counter()
+        users, suggested, scores = suggest(
+            followers, authors, k=options['top'], only=options['users']
+        )
+        elapsed = time.perf_counter() - started
+        with transaction.atomic():
+            stale = FollowSuggestion.objects.all()
+            if options['users']:
+                stale = stale.filter(user_id__in=options['users'])
+            stale.delete()
+            FollowSuggestion.objects.bulk_create(
+                (
+                    FollowSuggestion(
+                        user_id=int(user), author_id=int(author),
+                        score=float(score)
+                    )
+                    for user, author, score in zip(users, suggested, scores)
+                ),
+                batch_size=options['batch_size'],
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Рёбер: {len(pairs)}, рекомендаций: {len(users)}, '
+            f'расчёт: {elapsed:.2f} с'
+        ))
+
+    def benchmark(self, edges, top):
+        followers, authors = random_graph(edges)
+        started = time.perf_counter()
+        users, _, _ = suggest(followers, authors, k=top)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Рёбер: {len(followers)}, рекомендаций: {len(users)}, '
+            f'расчёт: {elapsed:.2f} с'
+        )
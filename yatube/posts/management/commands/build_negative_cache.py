@@ -0,0 +1,32 @@
+import uuid
+
+from django.core.management.base import BaseCommand
+
+from posts import negative_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересборка фильтров Блума для быстрых 404 и замер доли ложных '
+        'срабатываний на случайных ключах.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--probes', type=int, default=10000,
+            help='Сколько заведомо несуществующих ключей проверить.'
+        )
+
+    def handle(self, *args, **options):
+        for kind, index in negative_cache.INDEXES.items():
+            data = negative_cache.build(kind)[0]
+            if kind == 'post':
+                self.stdout.write(f'{kind}: максимальный id {data}')
+                continue
+            probes = [uuid.uuid4().hex for _ in range(options['probes'])]
+            passed = sum(index.contains(data, probe) for probe in probes)
+            self.stdout.write(
+                f'{kind}: {len(data.bits)} байт, {data.hashes} хешей, '
+                f'оценка {data.false_positive_rate():.4%}, '
+                f'замер {passed / len(probes):.4%}'
+            )
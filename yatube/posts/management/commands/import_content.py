@@ -0,0 +1,208 @@
+import csv
+import json
+import os
+from contextlib import contextmanager, nullcontext
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.models import Comment, Follow, Group, Post, User
+from posts.signals import content_imported
+
+
+class Resolver:
+    """Пакетное сопоставление естественных ключей (username, slug) с pk."""
+
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+        self.known = {}
+
+    def resolve(self, values):
+        missing = {
+            value for value in values if value and value not in self.known
+        }
+        if missing:
+            self.known.update(
+                self.model.objects.filter(
+                    **{f'{self.field}__in': missing}
+                ).values_list(self.field, 'pk')
+            )
+            # Неизвестные значения тоже запоминаем, чтобы не искать повторно.
+            for value in missing - self.known.keys():
+                self.known[value] = None
+        return self.known
+
+
+def read_rows(path, fmt):
+    """Построчно читает NDJSON или CSV, не загружая файл целиком."""
+    with open(path, encoding='utf-8', newline='') as source:
+        if fmt == 'csv':
+            yield from csv.DictReader(source)
+            return
+        for line in source:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def parse_date(value):
+    if not value:
+        return timezone.now()
+    date = parse_datetime(value)
+    if date is None:
+        raise ValueError(f'Некорректная дата: {value}')
+    if timezone.is_naive(date):
+        date = timezone.make_aware(date, timezone.utc)
+    return date
+
+
+@contextmanager
+def preserve_dates(model, field_name):
+    """Отключает auto_now_add, чтобы сохранить даты из исходной системы."""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = 'Массовый импорт постов, комментариев и подписок из NDJSON/CSV.'
+
+    models = {
+        'post': (Post, 'pub_date'),
+        'comment': (Comment, 'created'),
+        'follow': (Follow, None),
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл .ndjson/.jsonl или .csv')
+        parser.add_argument(
+            '--model', required=True, choices=sorted(self.models),
+            help='Какие записи содержит файл.'
+        )
+        parser.add_argument(
+            '--format', choices=('ndjson', 'csv'),
+            help='Формат файла; по умолчанию определяется по расширению.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Количество строк в одной транзакции.'
+        )
+        parser.add_argument(
+            '--no-fk-checks', action='store_true',
+            help='Отключить проверку внешних ключей на время загрузки.'
+        )
+        parser.add_argument(
+            '--no-rebuild', action='store_true',
+            help='Не перестраивать индексы и производные данные.'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.exists(path):
+            raise CommandError(f'Файл {path} не найден')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size должен быть положительным')
+        fmt = options['format'] or (
+            'csv' if path.endswith('.csv') else 'ndjson'
+        )
+        model, date_field = self.models[options['model']]
+        self.users = Resolver(User, 'username')
+        self.groups = Resolver(Group, 'slug')
+        build = getattr(self, f'build_{options["model"]}s')
+
+        checks = (
+            connection.constraint_checks_disabled()
+            if options['no_fk_checks'] else nullcontext()
+        )
+        dates = (
+            preserve_dates(model, date_field)
+            if date_field else nullcontext()
+        )
+        created = skipped = 0
+        rows = read_rows(path, fmt)
+        with checks, dates:
+            while True:
+                batch = list(islice(rows, options['batch_size']))
+                if not batch:
+                    break
+                objects = build(batch)
+                skipped += len(batch) - len(objects)
+                with transaction.atomic():
+                    model.objects.bulk_create(
+                        objects, ignore_conflicts=model is Follow
+                    )
+                created += len(objects)
+                self.stdout.write(f'{model.__name__}: {created}', ending='\r')
+        self.stdout.write('')
+        if not options['no_rebuild']:
+            self.rebuild(model)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: {created}, пропущено: {skipped}'
+        ))
+
+    def build_posts(self, rows):
+        users = self.users.resolve(row.get('author') for row in rows)
+        groups = self.groups.resolve(row.get('group') for row in rows)
+        posts = []
+        for row in rows:
+            author_id = users.get(row.get('author'))
+            if author_id is None:
+                continue
+            posts.append(Post(
+                id=row.get('id') or None,
+                text=row['text'],
+                author_id=author_id,
+                group_id=groups.get(row.get('group')),
+                image=row.get('image') or '',
+                pub_date=parse_date(row.get('pub_date')),
+            ))
+        return posts
+
+    def build_comments(self, rows):
+        users = self.users.resolve(row.get('author') for row in rows)
+        comments = []
+        for row in rows:
+            author_id = users.get(row.get('author'))
+            if author_id is None or not row.get('post'):
+                continue
+            comments.append(Comment(
+                id=row.get('id') or None,
+                post_id=row['post'],
+                author_id=author_id,
+                text=row['text'],
+                created=parse_date(row.get('created')),
+            ))
+        return comments
+
+    def build_follows(self, rows):
+        users = self.users.resolve(
+            name
+            for row in rows
+            for name in (row.get('user'), row.get('author'))
+        )
+        follows = []
+        for row in rows:
+            user_id = users.get(row.get('user'))
+            author_id = users.get(row.get('author'))
+            if None in (user_id, author_id) or user_id == author_id:
+                continue
+            follows.append(Follow(user_id=user_id, author_id=author_id))
+        return follows
+
+    def rebuild(self, model):
+        """Сбрасывает последовательности, обновляет статистику планировщика
+        и сообщает подписчикам о необходимости пересчитать производные данные.
+        """
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [model]):
+                cursor.execute(sql)
+            cursor.execute(f'ANALYZE {model._meta.db_table}')
+        content_imported.send(sender=model, models=[model])
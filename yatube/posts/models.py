@@ -20,6 +20,7 @@ class Post(models.Model):
         help_text='Введите текст поста'
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated = models.DateTimeField('Дата изменения', auto_now=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -43,6 +44,10 @@ class Post(models.Model):
 
     class Meta:
         ordering = ('-pub_date', )
+        indexes = (
+            models.Index(fields=('author', '-pub_date')),
+            models.Index(fields=('group', '-pub_date')),
+        )
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -92,3 +97,83 @@ class Follow(models.Model):
 
     def __str__(self):
         return str(self.user)
+
+
+class FollowSuggestion(models.Model):
+    """Предрассчитанные рекомендации «на кого подписаться»."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('-score', )
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author',), name='unique_suggestion'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.user} -> {self.author}'
+
+
+class GroupFollow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_subscriptions'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='subscribers'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'group',), name='unique_group_subscription'
+            ),
+        )
+
+    def __str__(self):
+        return str(self.user)
+
+
+class Mute(models.Model):
+    """Скрытые и заблокированные пользователем авторы."""
+    MUTE = 'mute'
+    BLOCK = 'block'
+    KINDS = (
+        (MUTE, 'Скрыть'),
+        (BLOCK, 'Заблокировать'),
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='muting'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='muted_by'
+    )
+    kind = models.CharField(max_length=5, choices=KINDS, default=MUTE)
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author',), name='unique_mute'
+            ),
+        )
+
+    def __str__(self):
+        return str(self.user)
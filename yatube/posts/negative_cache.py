@@ -0,0 +1,184 @@
+"""Отрицательный кэш для поиска профилей, групп и постов.
+
+Боты перебирают /profile/<имя>/, /group/<slug>/ и /posts/<id>/, и
+каждый такой запрос доходит до БД ради 404. Здесь хранятся фильтры
+Блума по существующим username и slug и максимальный id поста: если
+фильтр отвечает «точно нет», entity_cache отдаёт 404 без запроса.
+
+Фильтры собираются лениво и живут NEGATIVE_CACHE_TIMEOUT секунд, после
+чего собираются заново и забывают удалённые записи. Новые записи
+добавляются обработчиками post_save под замком. Добавления, сделанные
+во время сборки, помнятся в записи RECENT секунд и вливаются в новый
+фильтр, иначе сборка по старому снимку потеряла бы их. Фильтр хранится
+в NEGATIVE_CACHE мимо L1: устаревшая копия давала бы 404 новым
+пользователям.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Max
+
+from core.bloom import BloomFilter
+
+from .models import Group, Post, User
+
+CACHE_ALIAS = getattr(settings, 'NEGATIVE_CACHE', 'default')
+TIMEOUT = getattr(settings, 'NEGATIVE_CACHE_TIMEOUT', 60 * 60)
+ERROR_RATE = getattr(settings, 'NEGATIVE_CACHE_ERROR_RATE', 0.01)
+# Запас ёмкости на записи, добавленные до следующей сборки.
+MIN_CAPACITY = 1000
+RECENT = 10 * 60
+LOCK_TIMEOUT = 5
+LOCK_POLL = 0.01
+
+
+class _BloomIndex:
+    def __init__(self, model, field):
+        self.model = model
+        self.field = field
+
+    def build(self):
+        values = self.model.objects.values_list(self.field, flat=True)
+        bloom = BloomFilter(
+            max(2 * values.count(), MIN_CAPACITY), ERROR_RATE
+        )
+        for value in values.iterator():
+            bloom.add(value)
+        return bloom
+
+    def add(self, data, value):
+        data.add(value)
+        return data
+
+    def contains(self, data, value):
+        return value in data
+
+
+class _RangeIndex:
+    """Для числовых id достаточно максимума."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def build(self):
+        return self.model.objects.aggregate(top=Max('pk'))['top'] or 0
+
+    def add(self, data, value):
+        return max(data, int(value))
+
+    def contains(self, data, value):
+        return int(value) <= data
+
+
+INDEXES = {
+    'username': _BloomIndex(User, 'username'),
+    'slug': _BloomIndex(Group, 'slug'),
+    'post': _RangeIndex(Post),
+}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _key(kind):
+    return f'negative:{kind}'
+
+
+def _lock(cache, key):
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while not cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(LOCK_POLL)
+    return True
+
+
+def _unlock(cache, key):
+    cache.delete(f'{key}:lock')
+
+
+def build(kind):
+    """Собирает индекс заново; возвращает запись (data, recent, built)."""
+    index = INDEXES[kind]
+    cache = _cache()
+    key = _key(kind)
+    started = time.time()
+    data = index.build()
+    if not _lock(cache, key):
+        return data, [], started
+    try:
+        current = cache.get(key)
+        recent = []
+        if current is not None:
+            recent = [
+                (added, value) for added, value in current[1]
+                if added >= started - RECENT
+            ]
+        for _, value in recent:
+            data = index.add(data, value)
+        cache.set(key, (data, recent, started), 2 * TIMEOUT)
+    finally:
+        _unlock(cache, key)
+    return data, recent, started
+
+
+def _entry(kind):
+    entry = _cache().get(_key(kind))
+    # Срок считается от сборки: добавления перезаписывают запись, но не
+    # должны откладывать пересборку.
+    if entry is None or entry[0] is None or (
+        entry[2] < time.time() - TIMEOUT
+    ):
+        entry = build(kind)
+    return entry
+
+
+def might_exist(kind, value):
+    """False, если записи с таким ключом точно нет."""
+    return INDEXES[kind].contains(_entry(kind)[0], value)
+
+
+def might_exist_many(kind, values):
+    """Те из values, которые могут существовать."""
+    if not values:
+        return []
+    index = INDEXES[kind]
+    data = _entry(kind)[0]
+    return [value for value in values if index.contains(data, value)]
+
+
+def added(kind, value):
+    """Запоминает новую запись.
+
+    Если фильтра ещё нет, запись всё равно попадает в recent: её
+    может не оказаться в снимке, с которого сейчас идёт сборка.
+    """
+    index = INDEXES[kind]
+    cache = _cache()
+    key = _key(kind)
+    entry = cache.get(key)
+    if entry is not None and entry[0] is not None:
+        if index.contains(entry[0], value):
+            return
+    if not _lock(cache, key):
+        # Без замка правка могла бы потеряться: пусть фильтр соберётся
+        # заново.
+        cache.delete(key)
+        return
+    try:
+        data, recent, built = cache.get(key) or (None, [], 0)
+        now = time.time()
+        recent = [item for item in recent if item[0] >= now - RECENT]
+        recent.append((now, value))
+        if data is not None:
+            data = index.add(data, value)
+        cache.set(key, (data, recent, built), 2 * TIMEOUT)
+    finally:
+        _unlock(cache, key)
+
+
+def reset():
+    """Сбрасывает все индексы, например после массового импорта."""
+    _cache().delete_many([_key(kind) for kind in INDEXES])
@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from . import entity_cache, feed_ids, negative_cache
+from .models import Group, Post, User
+
+
+# Отправляется после массовой загрузки данных: bulk_create не вызывает
+# post_save, поэтому производные данные (кэши, счётчики) нужно
+# перестроить одним проходом. sender — модель, models — список
+# затронутых моделей.
+content_imported = Signal()
+
+
+@receiver(pre_save, sender=Post)
+def remember_group(sender, instance, **kwargs):
+    instance._saved_group_id = None
+    if instance.pk is not None:
+        instance._saved_group_id = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', flat=True).first()
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    entity_cache.invalidate_post(instance.pk)
+    if created:
+        negative_cache.added('post', instance.pk)
+        feed_ids.post_created(instance)
+    elif instance._saved_group_id != instance.group_id:
+        feed_ids.post_moved(instance, instance._saved_group_id)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    entity_cache.invalidate_post(instance.pk)
+    feed_ids.post_deleted(instance)
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender, instance, **kwargs):
+    entity_cache.invalidate_user(instance)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, **kwargs):
+    negative_cache.added('username', instance.username)
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    negative_cache.added('slug', instance.slug)
+
+
+@receiver((post_save, post_delete), sender=Group)
+def group_changed(sender, instance, **kwargs):
+    entity_cache.invalidate_group(instance)
+
+
+@receiver(content_imported)
+def reset_caches(sender, **kwargs):
+    feed_ids.reset()
+    negative_cache.reset()
@@ -0,0 +1,102 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from django.urls import reverse
+
+from posts.models import (Comment, Follow, FollowSuggestion, Group, Post,
+                          User)
+
+
+class ImportContentCommandTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.user = User.objects.create_user(username='Luchik')
+        cls.author = User.objects.create_user(username='Kot')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.temp_dir, ignore_errors=True)
+
+    def write(self, name, content):
+        path = f'{self.temp_dir}/{name}'
+        with open(path, 'w', encoding='utf-8') as target:
+            target.write(content)
+        return path
+
+    def test_import_posts_ndjson(self):
+        """Посты импортируются с сохранением даты, неизвестные авторы
+        пропускаются."""
+        rows = [
+            {'text': 'Старый пост', 'author': 'Kot', 'group': 'test-slug',
+             'pub_date': '2015-05-01T10:00:00'},
+            {'text': 'Без группы', 'author': 'Luchik'},
+            {'text': 'Чужой', 'author': 'nobody'},
+        ]
+        path = self.write(
+            'posts.ndjson', '\n'.join(json.dumps(row) for row in rows)
+        )
+        call_command(
+            'import_content', path, model='post', batch_size=2,
+            stdout=StringIO()
+        )
+        self.assertEqual(Post.objects.count(), 2)
+        post = Post.objects.get(text='Старый пост')
+        self.assertEqual(post.group, self.group)
+        self.assertEqual(post.pub_date.year, 2015)
+
+    def test_import_comments_and_follows_csv(self):
+        """Комментарии и подписки импортируются из CSV без дублей."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        path = self.write(
+            'comments.csv', f'post,author,text\n{post.pk},Luchik,Коммент\n'
+        )
+        call_command(
+            'import_content', path, model='comment', stdout=StringIO()
+        )
+        path = self.write(
+            'follows.csv', 'user,author\nLuchik,Kot\nLuchik,Kot\nKot,Kot\n'
+        )
+        call_command(
+            'import_content', path, model='follow', stdout=StringIO()
+        )
+        self.assertEqual(Comment.objects.get().post, post)
+        self.assertEqual(Follow.objects.count(), 1)
+
+
+class BuildFollowSuggestionsCommandTests(TestCase):
+    def test_friends_of_friends(self):
+        """Рекомендуются авторы, на которых подписаны мои авторы."""
+        user, friend, author = (
+            User.objects.create_user(username=name)
+            for name in ('Luchik', 'Kot', 'Pes')
+        )
+        Follow.objects.create(user=user, author=friend)
+        Follow.objects.create(user=friend, author=author)
+        call_command('build_follow_suggestions', stdout=StringIO())
+        self.assertQuerysetEqual(
+            FollowSuggestion.objects.filter(user=user),
+            [author.pk], transform=lambda item: item.author_id
+        )
+        self.assertFalse(
+            FollowSuggestion.objects.filter(user=friend).exists()
+        )
+        self.client.force_login(user)
+        response = self.client.get(
+            reverse('posts:profile', args=[friend.username])
+        )
+        self.assertEqual(
+            response.context['suggestions'][0].author, author
+        )
@@ -1,8 +1,15 @@
+from django.http import Http404
 from django.test import TestCase, Client
 from django.urls import reverse
 from django import forms
-from posts.models import Post, Group, User, Comment, Follow
+from unittest import mock
+
+from posts import (cards, entity_cache, feed_ids, muting,
+                   negative_cache)
+from posts.models import (Post, Group, User, Comment, Follow, GroupFollow,
+                          Mute)
 from django.core.cache import cache
+from posts import follow_graph
 
 
 class PaginatorViewsTest(TestCase):
@@ -21,6 +28,9 @@ class PaginatorViewsTest(TestCase):
         cls.post = Post.objects.bulk_create(posts)
 
     def setUp(self):
+        # bulk_create не отправляет post_save: списки лент из кэша
+        # предыдущих тестов не знают о новых постах.
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -52,6 +62,7 @@ class PostURLTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -163,6 +174,7 @@ class PostTests(TestCase):
         )
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
@@ -284,6 +296,41 @@ class FollowTests(TestCase):
         reverse = self.client_auth_following.get('/follow/')
         self.assertNotContains(reverse, 'Тестовый пост')
 
+    def test_profile_following_flag(self):
+        """Флаг подписки в профиле обновляется после подписки и отписки."""
+        cache.clear()
+        url = reverse('posts:profile', kwargs={
+            'username': self.user_following.username
+        })
+        response = self.client_auth_follower.get(url)
+        self.assertFalse(response.context['following'])
+        self.client_auth_follower.get(reverse(
+            'posts:profile_follow',
+            kwargs={'username': self.user_following.username}
+        ))
+        response = self.client_auth_follower.get(url)
+        self.assertTrue(response.context['following'])
+        self.client_auth_follower.get(reverse(
+            'posts:profile_unfollow',
+            kwargs={'username': self.user_following.username}
+        ))
+        response = self.client_auth_follower.get(url)
+        self.assertFalse(response.context['following'])
+
+    def test_follow_graph_batch_check(self):
+        """Пакетная проверка подписок по странице авторов."""
+        cache.clear()
+        Follow.objects.create(user=self.user_follower,
+                              author=self.user_following)
+        author_ids = [self.user_following.pk, self.user_follower.pk]
+        self.assertEqual(
+            follow_graph.following_among(self.user_follower.pk, author_ids),
+            {self.user_following.pk}
+        )
+        self.assertTrue(follow_graph.is_following(
+            self.user_follower.pk, self.user_following.pk
+        ))
+
     def test_not_follow_yourself(self):
         """Нельзя подписаться на самого себя, т.е. follower и following
          не могут быть одним и тем же человеком в этом случае."""
@@ -296,3 +343,214 @@ class FollowTests(TestCase):
                 user=self.user_following, author=self.user_following
             ).exists(), False
         )
+
+
+class GroupFollowTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='Luchik')
+        self.author = User.objects.create_user(username='Kot')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        self.client.force_login(self.user)
+
+    def test_group_follow_and_unfollow(self):
+        self.client.get(
+            reverse('posts:group_follow', kwargs={'slug': 'test-slug'})
+        )
+        self.assertTrue(GroupFollow.objects.filter(
+            user=self.user, group=self.group
+        ).exists())
+        response = self.client.get(
+            reverse('posts:group_list', kwargs={'slug': 'test-slug'})
+        )
+        self.assertTrue(response.context['subscribed'])
+        self.client.get(
+            reverse('posts:group_unfollow', kwargs={'slug': 'test-slug'})
+        )
+        self.assertFalse(GroupFollow.objects.exists())
+
+    def test_personal_feed_merges_without_duplicates(self):
+        """В ленте посты избранных авторов и групп, каждый по разу."""
+        GroupFollow.objects.create(user=self.user, group=self.group)
+        Follow.objects.create(user=self.user, author=self.author)
+        other = User.objects.create_user(username='Pes')
+        in_group = Post.objects.create(
+            author=other, text='Пост в группе', group=self.group
+        )
+        both = Post.objects.create(
+            author=self.author, text='Оба', group=self.group
+        )
+        by_author = Post.objects.create(author=self.author, text='Автор')
+        Post.objects.create(author=other, text='Чужой')
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            list(response.context['page_obj']), [by_author, both, in_group]
+        )
+
+
+class MuteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Luchik')
+        self.author = User.objects.create_user(username='Kot')
+        self.post = Post.objects.create(author=self.author, text='Пост Кота')
+        self.client.force_login(self.user)
+
+    def mute(self, name='posts:profile_mute'):
+        self.client.get(reverse(name, kwargs={'username': 'Kot'}))
+
+    def test_muted_author_hidden_from_index(self):
+        self.mute()
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotIn(self.post, response.context['page_obj'])
+        self.mute('posts:profile_unmute')
+        cache.clear()
+        response = self.client.get(reverse('posts:index'))
+        self.assertIn(self.post, response.context['page_obj'])
+
+    def test_large_mute_list_uses_anti_join(self):
+        """Длинный список скрытых авторов исключается подзапросом."""
+        self.mute()
+        with mock.patch.object(muting, 'INLINE_LIMIT', 0):
+            posts = muting.exclude_muted(Post.objects.all(), self.user)
+            self.assertIn('posts_mute', str(posts.query))
+            self.assertNotIn(self.post, posts)
+
+    def test_blocked_author_cannot_follow(self):
+        Follow.objects.create(user=self.author, author=self.user)
+        self.mute('posts:profile_block')
+        self.assertEqual(Mute.objects.get().kind, Mute.BLOCK)
+        self.assertFalse(Follow.objects.exists())
+        self.client.force_login(self.author)
+        self.client.get(reverse(
+            'posts:profile_follow', kwargs={'username': 'Luchik'}
+        ))
+        self.assertFalse(Follow.objects.exists())
+
+
+class EntityCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Luchik')
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+            for i in range(3)
+        ]
+
+    def test_hydrate_keeps_order_and_skips_missing(self):
+        ids = [self.posts[2].pk, 0, self.posts[0].pk]
+        self.assertEqual(
+            entity_cache.hydrate(ids), [self.posts[2], self.posts[0]]
+        )
+        with self.assertNumQueries(0):
+            posts = entity_cache.hydrate(ids[::2])
+            self.assertEqual(posts[0].author.username, 'Luchik')
+
+    def test_save_invalidates_post(self):
+        post = self.posts[0]
+        entity_cache.get_post(post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(entity_cache.get_post(post.pk).text, 'Новый текст')
+
+    def test_renamed_user_not_found_by_old_name(self):
+        entity_cache.get_user('Luchik')
+        self.author.username = 'Kot'
+        self.author.save()
+        self.assertEqual(entity_cache.get_user('Kot'), self.author)
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'Luchik'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class FeedIdsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Luchik')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.posts = [
+            Post.objects.create(author=self.author, text=f'Пост {i}')
+            for i in range(5)
+        ]
+
+    def test_list_follows_creation_and_deletion(self):
+        feed = feed_ids.index()
+        self.assertEqual(feed[:2], self.posts[:-3:-1])
+        post = Post.objects.create(author=self.author, text='Новый')
+        self.posts[0].delete()
+        feed = feed_ids.index()
+        with self.assertNumQueries(0):
+            self.assertEqual(feed.count(), 5)
+        self.assertEqual(feed[:1], [post])
+        self.assertNotIn(self.posts[0], feed[:10])
+
+    def test_pages_beyond_window_read_from_db(self):
+        with mock.patch.object(feed_ids, 'LIMIT', 2):
+            feed = feed_ids.author(self.author)
+            self.assertEqual(feed.count(), 5)
+            self.assertEqual(feed[3:5], self.posts[1::-1])
+
+    def test_moved_post_changes_group_feed(self):
+        post = self.posts[0]
+        self.assertEqual(feed_ids.group(self.group).count(), 0)
+        post.group = self.group
+        post.save()
+        self.assertEqual(feed_ids.group(self.group)[:10], [post])
+
+
+class CardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Luchik')
+        self.group = Group.objects.create(title='Группа', slug='group')
+        self.post = Post.objects.create(
+            author=self.author, text='Старый текст', group=self.group
+        )
+
+    def test_card_shared_between_feeds(self):
+        self.client.get(reverse('posts:index'))
+        with mock.patch.object(cards, 'render_card') as render_card:
+            response = self.client.get(
+                reverse('posts:group_list', kwargs={'slug': 'group'})
+            )
+        render_card.assert_not_called()
+        self.assertContains(response, 'Старый текст')
+
+    def test_edit_changes_card(self):
+        self.client.get(reverse('posts:index'))
+        self.post.text = 'Новый текст'
+        self.post.save()
+        response = self.client.get(
+            reverse('posts:profile', kwargs={'username': 'Luchik'})
+        )
+        self.assertContains(response, 'Новый текст')
+
+
+class NegativeCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Luchik')
+        self.post = Post.objects.create(author=self.author, text='Пост')
+
+    def test_unknown_keys_rejected_without_query(self):
+        negative_cache.build('username')
+        negative_cache.build('post')
+        with self.assertNumQueries(0):
+            with self.assertRaises(Http404):
+                entity_cache.get_user('bot-probe')
+            with self.assertRaises(Http404):
+                entity_cache.get_post(self.post.pk + 1000)
+
+    def test_new_records_found_after_build(self):
+        negative_cache.build('username')
+        negative_cache.build('slug')
+        User.objects.create_user(username='Kot')
+        Group.objects.create(title='Группа', slug='group')
+        self.assertEqual(entity_cache.get_user('Kot').username, 'Kot')
+        self.assertEqual(entity_cache.get_group('group').slug, 'group')
+        post = Post.objects.create(author=self.author, text='Новый')
+        self.assertEqual(entity_cache.get_post(post.pk), post)
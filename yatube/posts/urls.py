@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import feeds, views
 from django.conf import settings
 from django.conf.urls.static import static
 
@@ -8,6 +8,13 @@ app_name = 'posts'
 urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:slug>/follow/', views.group_follow, name='group_follow'
+    ),
+    path(
+        'group/<slug:slug>/unfollow/', views.group_unfollow,
+        name='group_unfollow'
+    ),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
@@ -26,6 +33,45 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'profile/<str:username>/mute/', views.profile_mute,
+        name='profile_mute'
+    ),
+    path(
+        'profile/<str:username>/unmute/', views.profile_unmute,
+        name='profile_unmute'
+    ),
+    path(
+        'profile/<str:username>/block/', views.profile_block,
+        name='profile_block'
+    ),
+    path(
+        'feeds/rss/', feeds.cached_feed(feeds.LatestPostsFeed),
+        name='feed_rss'
+    ),
+    path(
+        'feeds/atom/', feeds.cached_feed(feeds.LatestPostsAtomFeed),
+        name='feed_atom'
+    ),
+    path(
+        'group/<slug:slug>/rss/', feeds.cached_feed(feeds.GroupPostsFeed),
+        name='group_feed_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.cached_feed(feeds.GroupPostsAtomFeed),
+        name='group_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.cached_feed(feeds.AuthorPostsFeed),
+        name='profile_feed_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.cached_feed(feeds.AuthorPostsAtomFeed),
+        name='profile_feed_atom'
+    ),
 ]
 
 if settings.DEBUG:
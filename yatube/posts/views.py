@@ -1,9 +1,10 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
-from .models import Post, Group, User, Follow
+from .models import Post, Follow, FollowSuggestion, GroupFollow, Mute
 from .forms import PostForm, CommentForm
 from django.urls import reverse
+from . import entity_cache, feed_ids, follow_graph, muting
 
 
 def pagination(queryset, request):
@@ -14,45 +15,90 @@ def pagination(queryset, request):
     return page_obj
 
 
+def follow_suggestions(user, limit=5):
+    """Рекомендации «на кого подписаться» из предрассчитанной таблицы."""
+    if not user.is_authenticated:
+        return []
+    return FollowSuggestion.objects.filter(user=user).select_related(
+        'author'
+    )[:limit]
+
+
+def personal_feed(user):
+    """Посты избранных авторов и групп без дублей.
+
+    Две выборки объединяются через UNION: каждая идёт по своему индексу
+    (автор, дата) и (группа, дата), тогда как OR по двум JOIN вынуждает
+    СУБД перебирать всю таблицу постов.
+    """
+    by_authors = muting.exclude_muted(
+        Post.objects.filter(author__following__user=user), user
+    ).order_by()
+    by_groups = muting.exclude_muted(
+        Post.objects.filter(group__subscribers__user=user), user
+    ).order_by()
+    return by_authors.union(by_groups).order_by('-pub_date')
+
+
 def index(request):
     """Функционал главной страницы сайта."""
+    muting_key = muting.cache_key_part(request.user)
+    if muting_key:
+        post_list = muting.exclude_muted(Post.objects.all(), request.user)
+    else:
+        post_list = feed_ids.index()
     context = {
-        'page_obj': pagination(Post.objects.all(), request)
+        'page_obj': pagination(post_list, request),
+        'muting_key': muting_key,
     }
     return render(request, 'posts/index.html', context)
 
 
 def group_posts(request, slug):
     """Записи группы."""
-    group = get_object_or_404(Group, slug=slug)
+    group = entity_cache.get_group(slug)
+    subscribed = (
+        request.user.is_authenticated
+        and group.subscribers.filter(user=request.user).exists()
+    )
+    if muting.cache_key_part(request.user):
+        post_list = muting.exclude_muted(group.posts.all(), request.user)
+    else:
+        post_list = feed_ids.group(group)
     context = {
         'group': group,
-        'page_obj': (pagination(Post.objects.select_related('group').all(),
-                                request))
+        'subscribed': subscribed,
+        'page_obj': pagination(post_list, request)
     }
     return render(request, 'posts/group_list.html', context)
 
 
 def profile(request, username):
     """Профиль пользователя."""
-    author = get_object_or_404(User, username=username)
+    author = entity_cache.get_user(username)
     following = (
-        request.user.is_authenticated and author.following.filter(
-            user=request.user).exists()
+        request.user.is_authenticated
+        and follow_graph.is_following(request.user.pk, author.pk)
+    )
+    muted = (
+        request.user.is_authenticated
+        and author.pk in muting.muted_ids(request.user.pk)
     )
     profile = author
     context = {
         'author': author,
-        'page_obj': pagination(author.posts.all(), request),
+        'page_obj': pagination(feed_ids.author(author), request),
         'following': following,
-        'profile': profile
+        'muted': muted,
+        'profile': profile,
+        'suggestions': follow_suggestions(request.user),
     }
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
     """Станица поста с информацией."""
-    post_user = get_object_or_404(Post, id=post_id)
+    post_user = entity_cache.get_post(post_id)
     form = CommentForm(request.POST or None)
     comments = post_user.comments.all()
     context = {
@@ -105,7 +151,7 @@ def page_not_found(request):
 def add_comment(request, post_id):
     """Добавление комментария"""
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, id=post_id)
+    post = entity_cache.get_post(post_id)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -117,26 +163,90 @@ def add_comment(request, post_id):
 @login_required
 def follow_index(request):
     """Текущие подписки."""
-    post_list = Post.objects.filter(author__following__user=request.user)
-    paginator = Paginator(post_list, 20)
-    page_namber = request.GET.get('page_obj')
-    page = paginator.get_page(page_namber)
-    context = {'page_obj': page}
+    context = {
+        'page_obj': pagination(
+            feed_ids.follow(request.user, personal_feed(request.user)),
+            request
+        ),
+        'suggestions': follow_suggestions(request.user),
+    }
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
 def profile_follow(request, username):
     """Подписка."""
-    author = get_object_or_404(User, username=username)
-    if request.user != author:
+    author = entity_cache.get_user(username)
+    blocked = Mute.objects.filter(
+        user=author, author=request.user, kind=Mute.BLOCK
+    ).exists()
+    if request.user != author and not blocked:
         Follow.objects.get_or_create(user=request.user, author=author)
+        follow_graph.invalidate(request.user.pk)
+        feed_ids.invalidate_follow(request.user.pk)
     return redirect(reverse('posts:profile', args=[username]))
 
 
 @login_required
 def profile_unfollow(request, username):
     """Отписка."""
-    author = get_object_or_404(User, username=username)
+    author = entity_cache.get_user(username)
     Follow.objects.filter(user=request.user, author=author).delete()
+    follow_graph.invalidate(request.user.pk)
+    feed_ids.invalidate_follow(request.user.pk)
+    return redirect('posts:profile', username=author)
+
+
+@login_required
+def group_follow(request, slug):
+    """Подписка на группу."""
+    group = entity_cache.get_group(slug)
+    GroupFollow.objects.get_or_create(user=request.user, group=group)
+    feed_ids.invalidate_follow(request.user.pk)
+    return redirect('posts:group_list', slug=slug)
+
+
+@login_required
+def group_unfollow(request, slug):
+    """Отписка от группы."""
+    group = entity_cache.get_group(slug)
+    GroupFollow.objects.filter(user=request.user, group=group).delete()
+    feed_ids.invalidate_follow(request.user.pk)
+    return redirect('posts:group_list', slug=slug)
+
+
+def _mute(request, username, kind):
+    author = entity_cache.get_user(username)
+    if request.user != author:
+        Mute.objects.update_or_create(
+            user=request.user, author=author, defaults={'kind': kind}
+        )
+        muting.invalidate(request.user.pk)
+        feed_ids.invalidate_follow(request.user.pk)
+        if kind == Mute.BLOCK:
+            Follow.objects.filter(user=author, author=request.user).delete()
+            follow_graph.invalidate(author.pk)
+            feed_ids.invalidate_follow(author.pk)
+    return redirect('posts:profile', username=author)
+
+
+@login_required
+def profile_mute(request, username):
+    """Скрыть автора из лент."""
+    return _mute(request, username, Mute.MUTE)
+
+
+@login_required
+def profile_block(request, username):
+    """Заблокировать автора: скрыть его и запретить ему подписку."""
+    return _mute(request, username, Mute.BLOCK)
+
+
+@login_required
+def profile_unmute(request, username):
+    """Снять скрытие или блокировку."""
+    author = entity_cache.get_user(username)
+    Mute.objects.filter(user=request.user, author=author).delete()
+    muting.invalidate(request.user.pk)
+    feed_ids.invalidate_follow(request.user.pk)
     return redirect('posts:profile', username=author)
@@ -11,6 +11,8 @@ https://docs.djangoproject.com/en/2.2/ref/settings/
 """
 
 import os
+import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -55,6 +57,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.InvalidationMiddleware',
+    'core.middleware.PrimaryPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -89,13 +93,41 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# Соединения живут между запросами, а PRAGMAS применяются к каждому
+# новому соединению (core.db): WAL не даёт читателям и писателю
+# блокировать друг друга.
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
+        'PRAGMAS': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'busy_timeout': 5000,
+            'cache_size': -64000,
+            'mmap_size': 256 * 1024 * 1024,
+            'temp_store': 'MEMORY',
+        },
     }
 }
 
+# Чтение уходит в реплики, запись — в default (core.routers). Локальная
+# реплика SQLite обновляется командой sync_replica через backup API.
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = []
+# Сколько секунд после записи пользователь читает из основной БД; должно
+# быть больше интервала sync_replica.
+REPLICA_PIN_SECONDS = 10
+if os.environ.get('YATUBE_REPLICA_PATH'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['YATUBE_REPLICA_PATH'],
+        'PRAGMAS': {**DATABASES['default']['PRAGMAS'], 'query_only': 'ON'},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS = ['replica']
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -153,12 +185,50 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Двухуровневый кэш: LRU в памяти процесса поверх общего для всех
+# процессов кэша в файле SQLite.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-    }
+        'BACKEND': 'core.cache.TieredCache',
+        'OPTIONS': {
+            'L2': 'shared',
+            'L1_MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 5,
+            'INVALIDATION_CHANNEL': 'cache',
+        },
+    },
+    'shared': {
+        'BACKEND': 'core.cache.SQLiteCache',
+        'LOCATION': os.environ.get(
+            'YATUBE_CACHE_PATH', os.path.join(BASE_DIR, 'cache.sqlite3')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    },
 }
 
+# Тесты не должны видеть записи, оставшиеся от предыдущих запусков.
+if 'test' in sys.argv[1:2] or 'pytest' in sys.modules:
+    CACHES['shared']['LOCATION'] = os.path.join(
+        tempfile.gettempdir(), 'yatube-test-cache.sqlite3'
+    )
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(CACHES['shared']['LOCATION'] + suffix):
+            os.remove(CACHES['shared']['LOCATION'] + suffix)
+
+# Как часто процесс проверяет шину инвалидации локальных кэшей, секунд.
+INVALIDATION_POLL_INTERVAL = 0.5
+
+# Списки id постов в лентах правятся на месте, поэтому читаются из
+# общего кэша мимо L1.
+FEED_IDS_CACHE = 'shared'
+FEED_IDS_LIMIT = 1000
+
+# Фильтры Блума по существующим username и slug для быстрых 404.
+NEGATIVE_CACHE = 'shared'
+NEGATIVE_CACHE_ERROR_RATE = 0.01
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]